@@ -1,2 +1,40 @@
+""" The scalar core (Value and its errors) is imported eagerly and does not
+need numpy. array and the collection functions, storage, tables, parsing and
+streaming all depend on numpy and are imported on first attribute access.
+They are left out of __all__ so that "from units import *" stays numpy-free;
+import them by name instead. """
+import importlib
+import sys
+
 from . import units
-from .units import *
\ No newline at end of file
+from .units import *
+
+_LAZY = {
+    'array': 'quantity',
+    'sort': 'quantity',
+    'argsort': 'quantity',
+    'searchsorted': 'quantity',
+    'isclose': 'quantity',
+    'save': 'storage',
+    'load': 'storage',
+    'QuantityTable': 'table',
+    'parse': 'parsing',
+    'convert_stream': 'stream',
+}
+
+__all__ = ['Value', 'DimsDoNotAgreeError', 'ParseError', 'ConversionWarning']
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module('.' + _LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module %(1)r has no attribute %(2)r" % {'1': __name__, '2': name})
+
+
+if sys.version_info < (3, 7):
+    # No module-level __getattr__ before 3.7, so import eagerly.
+    del _LAZY['convert_stream']
+    for name in _LAZY:
+        __getattr__(name)
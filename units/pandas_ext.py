@@ -0,0 +1,333 @@
+""" pandas_ext.py provides a pandas extension dtype for unit-tagged columns.
+
+Importing this module registers the "units[...]" dtype and the Series.units
+accessor with pandas. It is not imported by the units package itself, so
+pandas remains an optional dependency:
+
+    import units.pandas_ext
+    s = pd.Series([1.0, 2.0], dtype='units[ft/s]')
+    s.units.to('m/s')
+
+Series.describe() is not supported for units columns, since pandas reports
+its statistics as plain floats; use s.units.describe() instead.
+"""
+from __future__ import print_function, division, absolute_import
+import re
+
+import numpy as np
+import pandas as pd
+from pandas.api.extensions import (ExtensionArray, ExtensionDtype, register_extension_dtype,
+                                   register_series_accessor, take)
+
+from .units import Value, _parse_units, _format_units
+from .quantity import array
+
+__all__ = ['UnitsDtype', 'UnitsArray']
+
+
+@register_extension_dtype
+class UnitsDtype(ExtensionDtype):
+    type = Value
+    na_value = np.nan
+    _metadata = ('unit',)
+    _match = re.compile(r'^units\[(.*)\]$')
+
+    def __init__(self, units=None):
+        """
+        Units may be given as a unit string ('m/s^2') or in the list form
+        used by Value (['m', 's^-2']).
+        """
+        if units is None:
+            units = []
+        elif isinstance(units, str):
+            units = _parse_units(units)
+        elif type(units) != list:
+            units = [units]
+        self.unit = _format_units(Value(1, units).units)
+
+    @property
+    def units(self):
+        return Value(1, _parse_units(self.unit)).units
+
+    @property
+    def name(self):
+        return 'units[%(1)s]' % {'1': self.unit}
+
+    @property
+    def _is_numeric(self):
+        return True
+
+    @classmethod
+    def construct_from_string(cls, string):
+        if not isinstance(string, str):
+            raise TypeError("'construct_from_string' expects a string, got %(1)s" % {'1': type(string)})
+        match = cls._match.match(string)
+        if match is None:
+            raise TypeError("Cannot construct a 'UnitsDtype' from '%(1)s'" % {'1': string})
+        return cls(match.group(1))
+
+    @classmethod
+    def construct_array_type(cls):
+        return UnitsArray
+
+    def _get_common_dtype(self, dtypes):
+        # Columns of the same dimensions concatenate in SI units.
+        if not all(isinstance(d, UnitsDtype) for d in dtypes):
+            return None
+        SIUnits = set(tuple(Value(1, d.units).SIUnits) for d in dtypes)
+        if len(SIUnits) != 1:
+            return None
+        if len(set(d.unit for d in dtypes)) == 1:
+            return self
+        return UnitsDtype(list(SIUnits.pop()))
+
+
+class UnitsArray(ExtensionArray):
+    """
+    A float64 buffer plus a UnitsDtype. Arithmetic and conversions are
+    delegated to units.array, so each operation is a single numpy pass.
+    """
+    # Let pandas unbox Series/Index before calling our operators.
+    __array_priority__ = 1000
+
+    def __init__(self, values, dtype, copy=False):
+        if not isinstance(dtype, UnitsDtype):
+            dtype = UnitsDtype(dtype)
+        self._data = np.array(values, dtype=float) if copy else np.asarray(values, dtype=float)
+        self._dtype = dtype
+
+    @classmethod
+    def from_quantity(cls, quantity):
+        """ Wrap a units.array without copying its buffer. """
+        return cls(quantity.value, UnitsDtype(quantity.units))
+
+    @property
+    def quantity(self):
+        """ The column as a units.array sharing this buffer. """
+        return array(self._data, self._dtype.units)
+
+    @classmethod
+    def _from_sequence(cls, scalars, dtype=None, copy=False):
+        if isinstance(dtype, str):
+            dtype = UnitsDtype.construct_from_string(dtype)
+        if isinstance(scalars, UnitsArray):
+            if dtype is None:
+                return scalars.copy() if copy else scalars
+            return scalars.astype(dtype, copy=copy)
+        if type(scalars) == array:
+            quantity = scalars
+        else:
+            scalars = np.asarray(scalars, dtype=object) if not isinstance(scalars, np.ndarray) else scalars
+            if scalars.dtype != object:
+                if dtype is None:
+                    raise TypeError('Units are required to build a UnitsArray from %(1)s' % {'1': scalars.dtype})
+                return cls(scalars, dtype, copy=copy)
+            is_value = np.array([type(s) == Value for s in scalars], dtype=bool)
+            values = np.full(len(scalars), np.nan)
+            if is_value.any():
+                quantity = array.fromvalues(list(scalars[is_value]))
+                if dtype is not None:
+                    quantity = quantity.to(dtype.units)
+                values[is_value] = quantity.value
+                dtype = UnitsDtype(quantity.units)
+            elif dtype is None:
+                raise TypeError('Units are required to build a UnitsArray from plain numbers')
+            rest = ~is_value & ~pd.isna(scalars)
+            values[rest] = scalars[rest].astype(float)
+            return cls(values, dtype)
+        if dtype is not None:
+            quantity = quantity.to(dtype.units)
+        return cls.from_quantity(quantity)
+
+    @classmethod
+    def _from_factorized(cls, values, original):
+        return cls(values, original.dtype)
+
+    @property
+    def dtype(self):
+        return self._dtype
+
+    @property
+    def nbytes(self):
+        return self._data.nbytes
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            value = self._data[key]
+            if np.isnan(value):
+                return self._dtype.na_value
+            return Value(value, self._dtype.units)
+        key = pd.api.indexers.check_array_indexer(self, key)
+        return UnitsArray(self._data[key], self._dtype)
+
+    def __setitem__(self, key, value):
+        key = pd.api.indexers.check_array_indexer(self, key)
+        if type(value) == Value:
+            value = array([value.value], value.units).to(self._dtype.units).value[0]
+        elif not pd.api.types.is_scalar(value):
+            value = UnitsArray._from_sequence(value, dtype=self._dtype)._data
+        self._data[key] = value
+
+    def __array__(self, dtype=None, copy=None):
+        if copy:
+            return np.array(self._data, dtype=dtype)
+        return np.asarray(self._data, dtype=dtype)
+
+    def isna(self):
+        return np.isnan(self._data)
+
+    def take(self, indices, allow_fill=False, fill_value=None):
+        if allow_fill and fill_value is not None and type(fill_value) == Value:
+            fill_value = array([fill_value.value], fill_value.units).to(self._dtype.units).value[0]
+        result = take(self._data, indices, allow_fill=allow_fill, fill_value=fill_value)
+        return UnitsArray(result, self._dtype)
+
+    def copy(self):
+        return UnitsArray(self._data, self._dtype, copy=True)
+
+    @classmethod
+    def _concat_same_type(cls, to_concat):
+        dtype = to_concat[0].dtype
+        return cls(np.concatenate([a.astype(dtype, copy=False)._data for a in to_concat]), dtype)
+
+    def _values_for_factorize(self):
+        return self._data, np.nan
+
+    def _values_for_argsort(self):
+        return self._data
+
+    def _formatter(self, boxed=False):
+        return lambda v: repr(v.value) if type(v) == Value else repr(v)
+
+    def astype(self, dtype, copy=True):
+        if isinstance(dtype, str) and UnitsDtype._match.match(dtype):
+            dtype = UnitsDtype.construct_from_string(dtype)
+        if isinstance(dtype, UnitsDtype):
+            if dtype == self._dtype:
+                return self.copy() if copy else self
+            return UnitsArray.from_quantity(self.quantity.to(dtype.units))
+        if copy:
+            return np.array(self._data, dtype=dtype)
+        return np.asarray(self._data, dtype=dtype)
+
+    def _reduce(self, name, skipna=True, keepdims=False, **kwargs):
+        if name not in ('sum', 'mean', 'min', 'max', 'std', 'median'):
+            raise TypeError('Reduction %(1)s not supported for %(2)s' % {'1': name, '2': self._dtype})
+        # Delegate to units.array so that absolute temperatures and delta_
+        # units behave as they do there.
+        quantity = self.quantity[~self.isna()] if skipna else self.quantity
+        if name == 'std':
+            result = quantity.std(ddof=kwargs.get('ddof', 1))
+        elif name == 'sum':
+            result = quantity.sum()
+        elif not len(quantity):
+            result = Value(np.nan, quantity.units)
+        elif name == 'median':
+            result = Value(np.median(quantity.value), quantity.units)
+        else:
+            result = getattr(quantity, name)()
+        if len(quantity) < kwargs.get('min_count', 0):
+            result = Value(np.nan, result.units)
+        if keepdims:
+            return UnitsArray([result.value], UnitsDtype(result.units))
+        return result
+
+    def isin(self, values):
+        """ Values are converted to the column's units before comparing, one
+        conversion per distinct unit signature. """
+        groups = {}
+        for v in values:
+            if type(v) != Value:
+                raise TypeError('isin not supported for type %(1)s' % {'1': type(v)})
+            groups.setdefault(tuple(v.units), []).append(v.value)
+        converted = [array(raw, list(units)).to(self._dtype.units).value for units, raw in groups.items()]
+        return np.isin(self._data, np.concatenate(converted) if converted else [])
+
+    def _quantile(self, qs, interpolation):
+        data = self._data[~self.isna()]
+        if not len(data):
+            return UnitsArray(np.full(len(qs), np.nan), self._dtype)
+        return UnitsArray(np.quantile(data, qs, method=interpolation), self._dtype)
+
+    def _operand(self, other):
+        if isinstance(other, (pd.Series, pd.Index, pd.DataFrame)):
+            return NotImplemented
+        if isinstance(other, UnitsArray):
+            return other.quantity
+        return other
+
+    def _arithmetic(op):
+        def method(self, other):
+            other = self._operand(other)
+            if other is NotImplemented:
+                return other
+            return UnitsArray.from_quantity(op(self.quantity, other))
+        return method
+
+    __add__ = _arithmetic(lambda a, b: a + b)
+    __radd__ = _arithmetic(lambda a, b: a + b)
+    __sub__ = _arithmetic(lambda a, b: a - b)
+    __rsub__ = _arithmetic(lambda a, b: -(a - b))
+    __mul__ = _arithmetic(lambda a, b: a * b)
+    __rmul__ = _arithmetic(lambda a, b: a * b)
+    __truediv__ = _arithmetic(lambda a, b: a / b)
+    __rtruediv__ = _arithmetic(lambda a, b: b / a)
+
+    def _comparison(op):
+        def method(self, other):
+            other = self._operand(other)
+            if other is NotImplemented:
+                return other
+            return op(self.quantity, other)
+        return method
+
+    __lt__ = _comparison(lambda a, b: a < b)
+    __le__ = _comparison(lambda a, b: a <= b)
+    __eq__ = _comparison(lambda a, b: a == b)
+    __ne__ = _comparison(lambda a, b: a != b)
+    __ge__ = _comparison(lambda a, b: a >= b)
+    __gt__ = _comparison(lambda a, b: a > b)
+
+    del _arithmetic, _comparison
+
+
+@register_series_accessor('units')
+class UnitsAccessor(object):
+    def __init__(self, series):
+        if not isinstance(series.dtype, UnitsDtype):
+            raise AttributeError('Can only use .units accessor with a units dtype')
+        self._series = series
+
+    def _wrap(self, quantity):
+        return pd.Series(UnitsArray.from_quantity(quantity), index=self._series.index, name=self._series.name)
+
+    @property
+    def quantity(self):
+        return self._series.array.quantity
+
+    def to(self, units):
+        return self._series.astype(UnitsDtype(units))
+
+    def describe(self, percentiles=None):
+        """
+        Summary statistics as Series.describe() gives them, but as Values in
+        the column's units (std in delta_ units for absolute temperatures).
+        """
+        if percentiles is None:
+            percentiles = [0.25, 0.5, 0.75]
+        series = self._series.dropna()
+        index = ['count', 'mean', 'std', 'min'] + ['%(1)g%%' % {'1': 100*p} for p in percentiles] + ['max']
+        stats = [len(series), series.mean(), series.std(), series.min()]
+        stats += list(series.quantile(percentiles)) + [series.max()]
+        return pd.Series(stats, index=index, name=self._series.name, dtype=object)
+
+    @property
+    def SI(self):
+        return self._wrap(self.quantity.convert('SI'))
+
+    @property
+    def IM(self):
+        return self._wrap(self.quantity.convert('IM'))
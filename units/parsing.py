@@ -0,0 +1,76 @@
+""" parsing.py provides bulk conversion of text quantities such as
+'12.5 ft/s' into a single unit-tagged array """
+from __future__ import print_function, division, absolute_import
+from collections import OrderedDict
+
+import numpy as np
+
+from .units import Value, ParseError, _affine, _parse_units
+from .quantity import array
+
+__all__ = ['parse']
+
+
+def parse(strings, units, errors='raise'):
+    """
+    Parse an iterable of '<number> <units>' strings, which may use any mix
+    of units with the same dimensions, into one array in the given units.
+
+    Rows are grouped by unit string so each distinct unit is resolved once
+    and every group is converted in a single vectorized pass. Rows that fail
+    (bad number, unknown unit or mismatched dimensions) are all collected
+    and raised together as a ParseError keyed by row index; with
+    errors='coerce' they become NaN instead.
+    """
+    if errors not in ('raise', 'coerce'):
+        raise ValueError("errors must be 'raise' or 'coerce', not %(1)s" % {'1': errors})
+    if type(units) != list:
+        units = _parse_units(units)
+    target = Value(1, units)
+
+    strings = np.asarray(list(strings), dtype=str)
+    if not len(strings):
+        return array(np.empty(0), target.units)
+    strings = np.char.strip(strings)
+    parts = np.char.partition(strings, ' ')
+    numbers = parts[..., 0]
+    unit_strings = np.char.strip(parts[..., 2])
+    failures = {}
+
+    try:
+        magnitudes = numbers.astype(float)
+    except ValueError:
+        magnitudes = np.empty(len(numbers))
+        for i, number in enumerate(numbers):
+            try:
+                magnitudes[i] = float(number)
+            except ValueError:
+                magnitudes[i] = np.nan
+                failures[i] = 'Cannot parse number %(1)r' % {'1': str(number)}
+
+    groups, inverse = np.unique(unit_strings, return_inverse=True)
+    factors = np.empty(len(groups))
+    offsets = np.zeros(len(groups))
+    for i, group in enumerate(groups):
+        try:
+            unit = Value(1, _parse_units(str(group)))
+        except (ValueError, KeyError):
+            message = 'Unknown units %(1)r' % {'1': str(group)}
+        else:
+            if unit.SIUnits == target.SIUnits:
+                factors[i], offsets[i] = _affine(unit, target)
+                continue
+            message = 'Units %(1)s do not agree with %(2)s' % {'1': unit.SIUnits, '2': target.SIUnits}
+        factors[i] = np.nan
+        for row in np.flatnonzero(inverse == i):
+            failures.setdefault(int(row), message)
+
+    result = magnitudes * factors[inverse]
+    if offsets.any():
+        result += offsets[inverse]
+    if failures and errors == 'raise':
+        failures = OrderedDict(sorted(failures.items()))
+        row, message = next(iter(failures.items()))
+        raise ParseError('%(1)s of %(2)s rows failed to parse; first at row %(3)s: %(4)s'
+                         % {'1': len(failures), '2': len(result), '3': row, '4': message}, failures)
+    return array(result, target.units)
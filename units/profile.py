@@ -0,0 +1,175 @@
+""" profile.py reports memory and allocation behaviour of Value.
+
+Run as
+    python -m units.profile [-n ITERATIONS] [--json]
+
+A fixed workload of Value construction, arithmetic and conversions is run
+under tracemalloc and gc. For each operation the report gives the bytes,
+memory blocks and gc-tracked objects retained per result, the transient peak
+while the operation runs with results discarded, and the gc collections it
+triggered. Retained bytes are also broken down by the Value method that
+allocated them. Output is sorted and fixed-width so reports from different
+versions can be diffed directly.
+"""
+from __future__ import print_function, division, absolute_import
+from collections import OrderedDict
+import argparse
+import gc
+import inspect
+import json
+import os
+import tracemalloc
+
+from . import units as _units
+from .units import Value
+
+__all__ = ['run', 'report', 'main']
+
+
+def _workload():
+    a = Value(100, ['mi', 'h^-1'])
+    b = Value(10, ['m', 's^-1'])
+    return OrderedDict([
+        ('Value()', lambda: Value(100, ['mi', 'h^-1'])),
+        ('a + b', lambda: a + b),
+        ('a - b', lambda: a - b),
+        ('a * b', lambda: a * b),
+        ('a * 2', lambda: a * 2),
+        ('a / b', lambda: a / b),
+        ('a ** 2', lambda: a ** 2),
+        ('-a', lambda: -a),
+        ('abs(a)', lambda: abs(a)),
+        ('a < b', lambda: a < b),
+        ('a.SIValue', lambda: a.SIValue),
+        ('a.SIUnits', lambda: a.SIUnits),
+        ('a.IMValue', lambda: a.IMValue),
+        ('a.IMUnits', lambda: a.IMUnits),
+    ])
+
+
+def run(n=1000):
+    """
+    Profile every workload operation over n iterations and return an
+    OrderedDict of operation name to its measurements.
+    """
+    methods = _method_ranges()
+    results = OrderedDict()
+    for name, op in _workload().items():
+        op()  # warm up caches so they are not charged to the operation
+        results[name] = _measure(op, n, methods)
+    return results
+
+
+def report(results, n):
+    lines = ['units allocation profile (n=%(1)d)' % {'1': n}, '']
+    lines.append('%-12s %10s %10s %10s %11s %8s' % ('operation', 'bytes/op', 'blocks/op', 'objects/op', 'peak bytes', 'gc runs'))
+    for name, r in results.items():
+        lines.append('%-12s %10d %10.1f %10.1f %11d %8d' % (name, r['bytes'], r['blocks'], r['objects'], r['peak'], r['collections']))
+    lines.append('')
+    lines.append('retained bytes/op by Value method')
+    for name, r in results.items():
+        lines.append(name)
+        for method, size in sorted(r['by_method'].items(), key=lambda item: (-item[1], item[0])):
+            lines.append('    %-22s %10d' % (method, size))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m units.profile', description='Report memory and allocation behaviour of units.Value.')
+    parser.add_argument('-n', '--iterations', type=int, default=1000, help='operations per measurement (default 1000)')
+    parser.add_argument('--json', action='store_true', help='print machine-readable JSON instead of a table')
+    args = parser.parse_args(argv)
+    results = run(args.iterations)
+    if args.json:
+        print(json.dumps({'n': args.iterations, 'operations': results}, indent=2, sort_keys=True))
+    else:
+        print(report(results, args.iterations))
+
+
+def _measure(op, n, methods):
+    # gc-tracked objects and collections while n results are kept alive
+    retained = [None] * n
+    gc.collect()
+    objects = len(gc.get_objects())
+    collections = _collections()
+    for i in range(n):
+        retained[i] = op()
+    collections = _collections() - collections
+    objects = len(gc.get_objects()) - objects
+    del retained
+
+    # bytes and blocks retained per result, by allocating Value method
+    retained = [None] * n
+    gc.collect()
+    tracemalloc.start(5)
+    try:
+        before = tracemalloc.take_snapshot()
+        for i in range(n):
+            retained[i] = op()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    stats = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), 'traceback')
+    by_method = {}
+    size = count = 0
+    for stat in stats:
+        size += stat.size_diff
+        count += stat.count_diff
+        method = _attribute(stat.traceback, methods)
+        by_method[method] = by_method.get(method, 0) + stat.size_diff
+    del retained, before, after, stats
+    gc.collect()
+
+    # transient peak with every result discarded straight away
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        for i in range(n):
+            op()
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'bytes': int(round(size / n)),
+        'blocks': round(count / n, 1),
+        'objects': round(objects / n, 1),
+        'peak': peak,
+        'collections': collections,
+        'by_method': dict((k, int(round(v / n))) for k, v in by_method.items() if int(round(v / n))),
+    }
+
+
+def _collections():
+    return sum(generation['collections'] for generation in gc.get_stats())
+
+
+def _method_ranges():
+    """ (first line, last line, name) of every Value method and property in
+    units/units.py, for attributing allocations to their source. """
+    ranges = []
+    for name, member in vars(Value).items():
+        function = member.fget if isinstance(member, property) else member
+        if not inspect.isfunction(function):
+            continue
+        lines, start = inspect.getsourcelines(function)
+        ranges.append((start, start + len(lines) - 1, name))
+    return sorted(ranges)
+
+
+def _attribute(traceback, methods):
+    """ Name of the innermost Value method in traceback, or '<other>'. """
+    source = os.path.normcase(os.path.abspath(_units.__file__))
+    for frame in reversed(list(traceback)):
+        if os.path.normcase(os.path.abspath(frame.filename)) != source:
+            continue
+        for start, end, name in methods:
+            if start <= frame.lineno <= end:
+                return name
+    return '<other>'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,636 @@
+""" quantity.py provides array, a numpy-backed sequence of values sharing
+one set of units """
+from __future__ import print_function, division, absolute_import
+import warnings
+
+import numpy as np
+
+from .units import Value, DimsDoNotAgreeError, ConversionWarning, _affine
+
+__all__ = ['array', 'sort', 'argsort', 'searchsorted', 'isclose']
+
+_trapz = getattr(np, 'trapezoid', None) or getattr(np, 'trapz')
+
+
+class array(object):
+    # Let numpy defer to array's reflected operators instead of
+    # broadcasting over it as an object.
+    __array_ufunc__ = None
+
+    def __init__(self, values, units, dtype=None):
+        """
+        Values are held in a single numpy buffer; units follow the same
+        convention as Value:
+            ['in', 's^-2']
+        Float and integer ndarrays (including np.memmap) and objects exposing
+        the buffer protocol (bytes, bytearray, memoryview) are wrapped without
+        copying. Conversion to SI or IM is deferred until SIValue/IMValue is
+        read, so slicing a large buffer only converts the touched elements.
+
+        dtype selects the storage type (any float or integer type); by default
+        float and integer ndarrays keep their type and anything else is
+        stored as float64. Conversions (convert, to, astype and the in-place
+        operators) keep the storage type: integer results are rounded, and a
+        ConversionWarning is issued when a conversion overflows or rounding
+        loses precision. SIValue, IMValue and the binary operators compute
+        integer values in float64.
+        """
+        if isinstance(values, (bytes, bytearray, memoryview)):
+            values = np.frombuffer(values, dtype=float if dtype is None else dtype)
+        elif dtype is not None:
+            values = np.asarray(values, dtype=dtype)
+        elif not (isinstance(values, np.ndarray) and values.dtype.kind in 'fiu'):
+            values = np.asarray(values, dtype=float)
+        if values.dtype.kind not in 'fiu':
+            raise TypeError('array values must be of a float or integer type, not %(1)s' % {'1': values.dtype})
+        self.__value = values
+        if type(units) != list:
+            units = [units]
+        self.__unit = Value(1, units)
+
+    @classmethod
+    def frombuffer(cls, buffer, units, dtype=float, count=-1, offset=0):
+        """ Wrap an existing buffer without copying. """
+        return cls(np.frombuffer(buffer, dtype=dtype, count=count, offset=offset), units)
+
+    @classmethod
+    def memmap(cls, filename, units, dtype=float, mode='r', offset=0, shape=None):
+        """ Attach units to a memory-mapped file. Nothing is read until the
+        values are accessed. """
+        return cls(np.memmap(filename, dtype=dtype, mode=mode, offset=offset, shape=shape), units)
+
+    @classmethod
+    def fromvalues(cls, values):
+        """
+        Build an array from a sequence of Values. Values sharing the same
+        units are gathered in one pass; if every Value has the same units
+        they are kept, otherwise the result is in SI units with one
+        conversion factor applied per distinct unit signature.
+        """
+        groups = {}
+        raw = np.empty(len(values), dtype=float)
+        for i, v in enumerate(values):
+            if type(v) != Value:
+                raise TypeError('Cannot build array from type %(1)s' % {'1': type(v)})
+            raw[i] = v.value
+            groups.setdefault(tuple(v.units), []).append(i)
+        if len(groups) <= 1:
+            return cls(raw, list(next(iter(groups), ())))
+        units = None
+        for key, index in groups.items():
+            unit = Value(1, list(key))
+            if units is None:
+                units = unit.SIUnits
+            elif unit.SIUnits != units:
+                raise DimsDoNotAgreeError('Cannot combine units %(1)s, %(2)s' % {'1': unit.SIUnits, '2': units})
+            raw[index] = raw[index] * unit.SIFactor + unit.SIOffset
+        return cls(raw, units)
+
+    @property
+    def value(self):
+        return self.__value
+
+    @property
+    def units(self):
+        return self.__unit.units
+
+    @property
+    def shape(self):
+        return self.__value.shape
+
+    @property
+    def ndim(self):
+        return self.__value.ndim
+
+    @property
+    def size(self):
+        return self.__value.size
+
+    @property
+    def dtype(self):
+        return self.__value.dtype
+
+    def __len__(self):
+        return len(self.__value)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, key):
+        return _wrap(self.__value[key], self.units)
+
+    def __str__(self):
+        return str(self.SIValue) + ' ' + str(self.SIUnits)
+
+    def __add__(self,b):
+        if type(b) != Value and type(b) != array:
+            raise TypeError('Addition not supported for types %(1)s, %(2)s' % {'1': type(b), '2': type(self)})
+        if b.SIUnits != self.SIUnits:
+            raise DimsDoNotAgreeError('Addition not supported for units %(1)s, %(2)s' % {'1': b.SIUnits, '2': self.SIUnits})
+        if self.SIOffset and b.SIOffset:
+            raise DimsDoNotAgreeError('Addition not supported for absolute temperatures %(1)s, %(2)s; use a delta_ unit for one operand' % {'1': b.units, '2': self.units})
+        if b.units == self.units and not self.SIOffset:
+            return array(self.value+b.value, self.units)
+        return array(self.SIValue+b.SIValue, self.SIUnits)
+
+    def __radd__(self,b):
+        return self.__add__(b)
+
+    def __sub__(self,b):
+        if type(b) != Value and type(b) != array:
+            raise TypeError('Subtraction not supported for types %(1)s, %(2)s' % {'1': type(b), '2': type(self)})
+        if b.SIUnits != self.SIUnits:
+            raise DimsDoNotAgreeError('Subtraction not supported for units %(1)s, %(2)s' % {'1': b.SIUnits, '2': self.SIUnits})
+        if b.units == self.units and not self.SIOffset:
+            return array(self.value-b.value, self.units)
+        return array(self.SIValue-b.SIValue, self.SIUnits)
+
+    def __rsub__(self,b):
+        return -(self.__sub__(b))
+
+    def __mul__(self,b):
+        if type(b) == Value or type(b) == array:
+            units = self.SIUnits + b.SIUnits
+            return array(self.SIValue*b.SIValue, self.__unit.units_simplify(units))
+        if not _is_numeric(b):
+            raise TypeError('Multiplication not supported for types %(1)s, %(2)s' % {'1': type(b), '2': type(self)})
+        x, units = self._scalar_operand()
+        return array(x*b, units)
+
+    def __rmul__(self,b):
+        return self.__mul__(b)
+
+    def __truediv__(self,b):
+        if type(b) == Value or type(b) == array:
+            units = self.SIUnits + self.__unit.units_inverter(b.SIUnits)
+            return array(self.SIValue/b.SIValue, self.__unit.units_simplify(units))
+        if not _is_numeric(b):
+            raise TypeError('Division not supported for types %(1)s, %(2)s' % {'1': type(b), '2': type(self)})
+        x, units = self._scalar_operand()
+        return array(x/b, units)
+
+    def __rtruediv__(self,b):
+        if type(b) == Value:
+            units = b.SIUnits + self.__unit.units_inverter(self.SIUnits)
+            return array(b.SIValue/self.SIValue, self.__unit.units_simplify(units))
+        if not _is_numeric(b):
+            raise TypeError('Division not supported for types %(1)s, %(2)s' % {'1': type(b), '2': type(self)})
+        return array(b/self.SIValue, self.__unit.units_simplify(self.__unit.units_inverter(self.SIUnits)))
+
+    def __pow__(self,b):
+        if type(b) != int and type(b) != float and type(b) != np.float32 and type(b) != np.float64:
+            raise TypeError('Power operation not supported for types %(1)s, %(2)s' % {'1': type(b), '2': type(self)})
+        return array(self.SIValue**b, self.__unit.units_pow(self.SIUnits, b))
+
+    def __neg__(self):
+        x, units = self._scalar_operand()
+        return array(-x, units)
+
+    def __abs__(self):
+        x, units = self._scalar_operand()
+        return array(abs(x), units)
+
+    def _scalar_operand(self):
+        # Absolute temperatures are scaled and negated in kelvin, as Value does.
+        if self.SIOffset:
+            return self.SIValue, self.SIUnits
+        return self.value, self.units
+
+    def _compare(self, b, op, symbol):
+        if type(b) != Value and type(b) != array:
+            raise TypeError('%(0)s not supported for types %(1)s, %(2)s' % {'0': symbol, '1': type(b), '2': type(self)})
+        if b.SIUnits != self.SIUnits:
+            raise DimsDoNotAgreeError('%(0)s not supported for units %(1)s, %(2)s' % {'0': symbol, '1': b.SIUnits, '2': self.SIUnits})
+        if b.units == self.units:
+            return op(self.value, b.value)
+        return op(self.SIValue, b.SIValue)
+
+    def __lt__(self,b):
+        return self._compare(b, np.less, '<')
+
+    def __le__(self,b):
+        return self._compare(b, np.less_equal, '<=')
+
+    def __eq__(self,b):
+        return self._compare(b, np.equal, '==')
+
+    def __ne__(self,b):
+        return self._compare(b, np.not_equal, '!=')
+
+    def __ge__(self,b):
+        return self._compare(b, np.greater_equal, '>=')
+
+    def __gt__(self,b):
+        return self._compare(b, np.greater, '>')
+
+    __hash__ = None
+
+    # In-place operators and out= variants. Unlike the binary operators these
+    # keep the array's own units rather than converting to SI, check units
+    # once per call and write into an existing buffer, so a loop such as
+    #     rate.multiply(dt, out=step)
+    #     state += step
+    # allocates no new buffers once step exists. An operand in different
+    # (compatible) units costs one temporary for its conversion.
+
+    def __iadd__(self,b):
+        return self.add(b, out=self)
+
+    def __isub__(self,b):
+        return self.subtract(b, out=self)
+
+    def __imul__(self,b):
+        return self.multiply(b, out=self)
+
+    def __itruediv__(self,b):
+        return self.divide(b, out=self)
+
+    def add(self, b, out=None):
+        return self._accumulate(b, np.add, out, 'Addition')
+
+    def subtract(self, b, out=None):
+        return self._accumulate(b, np.subtract, out, 'Subtraction')
+
+    def multiply(self, b, out=None):
+        if type(b) == Value or type(b) == array:
+            x, x_units, y, y_units = self._product_operands(b)
+            units = self.__unit.units_sorted(x_units + y_units)
+            self._check_out(units, out, 'Multiplication')
+            return self._store(_into(np.multiply, x, y, out), units, out)
+        if not _is_numeric(b):
+            raise TypeError('Multiplication not supported for types %(1)s, %(2)s' % {'1': type(b), '2': type(self)})
+        x, units = self._scalar_operand()
+        self._check_out(units, out, 'Multiplication')
+        return self._store(_into(np.multiply, x, b, out), units, out)
+
+    def divide(self, b, out=None):
+        if type(b) == Value or type(b) == array:
+            x, x_units, y, y_units = self._product_operands(b)
+            units = self.__unit.units_sorted(x_units + self.__unit.units_inverter(y_units))
+            self._check_out(units, out, 'Division')
+            return self._store(_into(np.true_divide, x, y, out), units, out)
+        if not _is_numeric(b):
+            raise TypeError('Division not supported for types %(1)s, %(2)s' % {'1': type(b), '2': type(self)})
+        x, units = self._scalar_operand()
+        self._check_out(units, out, 'Division')
+        return self._store(_into(np.true_divide, x, b, out), units, out)
+
+    def _accumulate(self, b, ufunc, out, name):
+        if type(b) != Value and type(b) != array:
+            raise TypeError('%(0)s not supported for types %(1)s, %(2)s' % {'0': name, '1': type(b), '2': type(self)})
+        if b.SIUnits != self.SIUnits:
+            raise DimsDoNotAgreeError('%(0)s not supported for units %(1)s, %(2)s' % {'0': name, '1': b.SIUnits, '2': self.SIUnits})
+        if self.SIOffset and b.SIOffset:
+            raise DimsDoNotAgreeError('%(0)s into absolute temperature %(1)s not supported for absolute temperature %(2)s' % {'0': name, '1': self.units, '2': b.units})
+        if b.units == self.units:
+            operand = b.value
+        else:
+            operand = _apply(b.value, b.SIFactor / self.SIFactor, b.SIOffset / self.SIFactor)
+        self._check_out(self.units, out, name)
+        return self._store(_into(ufunc, self.value, operand, out), self.units, out)
+
+    def _product_operands(self, b):
+        # Absolute temperatures are converted to kelvin before scaling, and
+        # operands naming one dimension in different units (m and ft) are
+        # combined in SI so that the result units simplify.
+        if self.SIOffset or b.SIOffset or self._mixes_units(b.units):
+            return self.SIValue, self.SIUnits, b.SIValue, b.SIUnits
+        return self.value, self.units, b.value, b.units
+
+    def _mixes_units(self, units):
+        names = set(u.split('^')[0] for u in self.units + units)
+        return len(set(self.__unit.conversion_units[n] for n in names)) != len(names)
+
+    def _check_out(self, units, out, name):
+        # Only the array itself is relabelled with the result units (as by
+        # *= and /=); any other out keeps its own, compatible, units.
+        if out is None or out is self or type(out) != array or out.units == units:
+            return
+        if Value(1, units).SIUnits != out.SIUnits:
+            raise DimsDoNotAgreeError('%(0)s result in %(1)s cannot be stored in %(2)s' % {'0': name, '1': units, '2': out.units})
+
+    def _store(self, result, units, out):
+        if out is None:
+            return array(result, units)
+        if out.units == units:
+            return out
+        if out is self:
+            out.__unit = Value(1, units)
+        else:
+            scale, offset = _affine(Value(1, units), out.__unit)
+            _apply(out.value, scale, offset, out=out.value)
+        return out
+
+    # Reductions and cumulative kernels. Each runs as a single numpy call on
+    # the stored buffer; results keep the array's units (or the appropriate
+    # product/quotient units) and collapse to a Value when fully reduced.
+    # Where accepted, dtype selects the accumulator, e.g. float64 sums of
+    # float32 data.
+
+    def sum(self, axis=None, dtype=None):
+        self._check_summable('Sum')
+        return _wrap(self.value.sum(axis=axis, dtype=dtype), self.units)
+
+    def mean(self, axis=None, dtype=None):
+        return _wrap(self.value.mean(axis=axis, dtype=dtype), self.units)
+
+    def min(self, axis=None):
+        return _wrap(self.value.min(axis=axis), self.units)
+
+    def max(self, axis=None):
+        return _wrap(self.value.max(axis=axis), self.units)
+
+    def std(self, axis=None, ddof=0, dtype=None):
+        return _wrap(self.value.std(axis=axis, ddof=ddof, dtype=dtype), self._delta_units())
+
+    def cumsum(self, axis=None, dtype=None):
+        self._check_summable('Cumulative sum')
+        return array(self.value.cumsum(axis=axis, dtype=dtype), self.units)
+
+    def diff(self, n=1, axis=-1):
+        return array(np.diff(self.value, n=n, axis=axis), self._delta_units())
+
+    def gradient(self, *varargs, **kwargs):
+        """
+        Spacings may be scalars, ndarrays, Values or arrays; the result
+        carries units of self divided by the spacing units. Returns a list
+        when the gradient is taken along more than one axis, as numpy does.
+        """
+        axis = kwargs.pop('axis', None)
+        spacings = [_magnitude(h) for h in varargs]
+        grads = np.gradient(self.SIValue, *[h[0] for h in spacings], axis=axis)
+        if not spacings:
+            spacings = [(1, [])]
+        if type(grads) != list and type(grads) != tuple:
+            return array(grads, self._quotient_units(spacings[0][1]))
+        if len(spacings) == 1:
+            spacings = spacings * len(grads)
+        return [array(g, self._quotient_units(h[1])) for g, h in zip(grads, spacings)]
+
+    def trapz(self, x=None, dx=1.0, axis=-1):
+        """
+        Integrate along the given axis using the trapezoidal rule. The
+        result carries units of self times the units of x (or dx).
+        """
+        if x is not None:
+            x, x_units = _magnitude(x)
+            integral = _trapz(self.SIValue, x=x, axis=axis)
+        else:
+            dx, x_units = _magnitude(dx)
+            integral = _trapz(self.SIValue, dx=dx, axis=axis)
+        units = self.__unit.units_simplify(self.SIUnits + x_units)
+        return _wrap(integral, units)
+
+    def convert(self, system='SI', inplace=False, dtype=None):
+        """
+        Return the array expressed in SI (or IM) units, stored as dtype
+        (default: the array's own). With inplace=True the conversion is
+        applied to the existing buffer, which must be writeable, and self is
+        returned.
+        """
+        if system == 'SI':
+            factor, offset, units = self.SIFactor, self.SIOffset, self.SIUnits
+        elif system == 'IM':
+            factor, offset, units = self.IMFactor, self.IMOffset, self.IMUnits
+        else:
+            raise ValueError('Unknown unit system %(1)s' % {'1': system})
+        if not inplace:
+            return array(_apply(self.__value, factor, offset, out=np.empty_like(self.__value, dtype=dtype)), units)
+        if dtype is not None and np.dtype(dtype) != self.dtype:
+            raise TypeError('Cannot convert %(1)s array to %(2)s in place' % {'1': self.dtype, '2': np.dtype(dtype)})
+        _apply(self.__value, factor, offset, out=self.__value)
+        self.__unit = Value(1, units)
+        return self
+
+    def to(self, units, dtype=None):
+        """
+        Return the array expressed in the given units, which must have the
+        same dimensions as the array's own, stored as dtype (default: the
+        array's own).
+        """
+        if type(units) != list:
+            units = [units]
+        target = Value(1, units)
+        if target.SIUnits != self.SIUnits:
+            raise DimsDoNotAgreeError('Conversion not supported for units %(1)s, %(2)s' % {'1': target.SIUnits, '2': self.SIUnits})
+        scale, offset = _affine(self.__unit, target)
+        return array(_apply(self.__value, scale, offset, out=np.empty_like(self.__value, dtype=dtype)), target.units)
+
+    def astype(self, dtype):
+        """ Return a copy stored as dtype, with the same checks as a
+        conversion. """
+        return array(_apply(self.__value, 1, 0, out=np.empty_like(self.__value, dtype=dtype)), self.units)
+
+    def _check_summable(self, name):
+        # As with +, absolute temperatures cannot be added together.
+        if self.SIOffset:
+            raise DimsDoNotAgreeError('%(0)s not supported for absolute temperature %(1)s; use a delta_ unit' % {'0': name, '1': self.units})
+
+    def _delta_units(self):
+        # Differences of absolute temperatures are intervals.
+        if self.SIOffset:
+            return ['delta_' + self.units[0]]
+        return self.units
+
+    def _quotient_units(self, units):
+        return self.__unit.units_simplify(self.SIUnits + self.__unit.units_inverter(units))
+
+    @property
+    def SIValue(self):
+        return _apply(self.__value, self.SIFactor, self.SIOffset)
+
+    @property
+    def SIFactor(self):
+        return self.__unit.SIFactor
+
+    @property
+    def SIOffset(self):
+        return self.__unit.SIOffset
+
+    @property
+    def SIUnits(self):
+        return self.__unit.SIUnits
+
+    @property
+    def SI(self):
+        return [self.SIValue, self.SIUnits]
+
+    @property
+    def IMValue(self):
+        return _apply(self.__value, self.IMFactor, self.IMOffset)
+
+    @property
+    def IMFactor(self):
+        return self.__unit.IMFactor
+
+    @property
+    def IMOffset(self):
+        return self.__unit.IMOffset
+
+    @property
+    def IMUnits(self):
+        return self.__unit.IMUnits
+
+    @property
+    def IM(self):
+        return [self.IMValue, self.IMUnits]
+
+
+# Sorting, searching and comparison over whole collections. Each accepts an
+# array or a sequence of Values in mixed but compatible units; dimensions are
+# validated once per distinct unit signature and the work itself is a single
+# numpy call on the converted buffer.
+
+def sort(a, axis=-1):
+    a = _as_quantity(a)
+    return array(np.sort(a.value, axis=axis), a.units)
+
+
+def argsort(a, axis=-1):
+    a = _as_quantity(a)
+    return np.argsort(a.value, axis=axis)
+
+
+def searchsorted(a, v, side='left'):
+    """
+    Indices where the Value(s) v would be inserted into the sorted
+    collection a to keep it ordered.
+    """
+    a = _as_quantity(a)
+    return np.searchsorted(a.value, _in_units(v, a), side=side)
+
+
+def isclose(a, b, rtol=1e-05, atol=None):
+    """
+    Element-wise closeness of two collections with the same dimensions.
+    atol, if given, is a Value (temperatures as intervals).
+    """
+    a = _as_quantity(a)
+    b = _in_units(b, a)
+    if atol is None:
+        tolerance = 0
+    elif type(atol) != Value:
+        raise TypeError('atol must be of type %(1)s, not %(2)s' % {'1': Value, '2': type(atol)})
+    elif atol.SIUnits != a.SIUnits:
+        raise DimsDoNotAgreeError('atol units %(1)s do not agree with %(2)s' % {'1': atol.SIUnits, '2': a.SIUnits})
+    else:
+        tolerance = atol.value * atol.SIFactor / a.SIFactor
+    return np.isclose(a.value, b, rtol=rtol, atol=tolerance)
+
+
+def _as_quantity(a):
+    if type(a) == array:
+        return a
+    if type(a) == Value:
+        return array([a.value], a.units)
+    return array.fromvalues(list(a))
+
+
+def _in_units(b, a):
+    """ Magnitudes of b (a Value, array or sequence of Values) in a's
+    units; a Value gives a scalar. """
+    if type(b) == Value:
+        b = array([b.value], b.units)
+        scalar = True
+    else:
+        b = _as_quantity(b)
+        scalar = False
+    if b.units != a.units:
+        b = b.to(a.units)
+    return b.value[0] if scalar else b.value
+
+
+def _apply(values, factor, offset, out=None):
+    """ Compute factor*values + offset in the dtype of out, writing into out.
+    Never upcasts out; warns with ConversionWarning on overflow, or when an
+    integer result had to be rounded. With no out the result is float, in
+    the dtype of float values or float64 for integers, and values itself is
+    returned when there is nothing to apply. """
+    if out is None:
+        if factor == 1 and offset == 0:
+            return values
+        dtype = np.result_type(values)
+        out = np.empty_like(values, dtype=dtype if dtype.kind == 'f' else np.float64)
+    if out.dtype.kind != 'f':
+        return _apply_integer(values, factor, offset, out)
+    overflow = []
+    with np.errstate(over='call', call=lambda *args: overflow.append(args)):
+        if factor != 1 or out is not values:
+            np.multiply(values, factor, out=out, dtype=out.dtype, casting='unsafe')
+        if offset != 0:
+            np.add(out, offset, out=out, dtype=out.dtype, casting='unsafe')
+    if overflow:
+        warnings.warn('Conversion overflowed %(1)s' % {'1': out.dtype}, ConversionWarning, stacklevel=3)
+    return out
+
+
+# Integers above this magnitude are not all representable in float64.
+_FLOAT_EXACT = 2**53
+
+
+def _apply_integer(values, factor, offset, out):
+    info = np.iinfo(out.dtype)
+    if factor == 1 and offset == 0 and np.result_type(values).kind in 'iu':
+        # Integer to integer copies are exact, so never go through float64.
+        if not np.can_cast(np.result_type(values), out.dtype) and np.size(values) and (np.min(values) < info.min or np.max(values) > info.max):
+            warnings.warn('Conversion overflowed %(1)s' % {'1': out.dtype}, ConversionWarning, stacklevel=4)
+        np.copyto(out, values, casting='unsafe')
+        return out
+    scaled = np.multiply(values, factor, dtype=np.float64)
+    if offset != 0:
+        scaled += offset
+    rounded = np.rint(scaled)
+    if rounded.size and (rounded.min() < info.min or rounded.max() > info.max):
+        warnings.warn('Conversion overflowed %(1)s' % {'1': out.dtype}, ConversionWarning, stacklevel=4)
+    elif not np.array_equal(rounded, scaled):
+        warnings.warn('Conversion to %(1)s rounded non-integer results' % {'1': out.dtype}, ConversionWarning, stacklevel=4)
+    elif rounded.size and (np.abs(rounded).max() > _FLOAT_EXACT or _exceeds_float(values)):
+        warnings.warn('Conversion to %(1)s lost precision beyond 2**53' % {'1': out.dtype}, ConversionWarning, stacklevel=4)
+    with np.errstate(invalid='ignore'):
+        np.copyto(out, rounded, casting='unsafe')
+    return out
+
+
+def _exceeds_float(values):
+    values = np.asarray(values)
+    return values.dtype.kind in 'iu' and values.size and (values.max() > _FLOAT_EXACT or values.min() < -_FLOAT_EXACT)
+
+
+def _into(ufunc, x, y, out):
+    """ ufunc(x, y) written into out's buffer. Integer operands are written
+    straight into an integer buffer when the result type allows; otherwise
+    the float result is rounded, with the same warnings as a conversion. """
+    buffer = _buffer(out)
+    if buffer is None or buffer.dtype.kind == 'f':
+        return ufunc(x, y, out=buffer)
+    try:
+        return ufunc(x, y, out=buffer, casting='safe')
+    except TypeError:
+        return _apply(ufunc(x, y), 1, 0, out=buffer)
+
+
+def _buffer(out):
+    if out is None:
+        return None
+    if type(out) != array:
+        raise TypeError('out must be of type %(1)s, not %(2)s' % {'1': array, '2': type(out)})
+    return out.value
+
+
+def _is_numeric(b):
+    return isinstance(b, (int, float, np.number, np.ndarray))
+
+
+def _magnitude(b):
+    """ Split an operand into its SI magnitude and SI units. """
+    if type(b) == Value or type(b) == array:
+        return b.SIValue, b.SIUnits
+    return b, []
+
+
+def _wrap(values, units):
+    """ Return a Value for fully reduced results, otherwise an array. """
+    if np.ndim(values) == 0:
+        return Value(values, units)
+    return array(values, units)
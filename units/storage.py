@@ -0,0 +1,112 @@
+""" storage.py provides a self-describing binary file format for unit-tagged
+arrays.
+
+Layout:
+    magic       b'\x93UNITS'
+    version     two unsigned bytes, major and minor
+    header_len  little-endian uint32
+    header      utf-8 JSON
+    data        one raw little-endian, C-ordered buffer per column; the data
+                section and every column start on an ALIGNMENT byte boundary
+
+The JSON header holds the unit signature, dtype, shape and byte offset
+(relative to the data section) of every column, so loading only needs to
+parse the header and then memory-map each column in place.
+"""
+from __future__ import print_function, division, absolute_import
+from collections import OrderedDict
+import json
+import struct
+
+import numpy as np
+
+from .quantity import array
+
+__all__ = ['save', 'load']
+
+MAGIC = b'\x93UNITS'
+VERSION = (1, 0)
+ALIGNMENT = 64
+_PREAMBLE = len(MAGIC) + 2 + 4
+
+
+def save(filename, data):
+    """
+    Write an array, or a mapping of column name to array, to filename.
+    """
+    if type(data) == array:
+        kind = 'array'
+        columns = [(None, data)]
+    else:
+        kind = 'table'
+        columns = list(data.items())
+    for name, column in columns:
+        if type(column) != array:
+            raise TypeError('Cannot save column %(1)s of type %(2)s' % {'1': name, '2': type(column)})
+
+    buffers = []
+    entries = []
+    for name, column in columns:
+        dtype = column.dtype.newbyteorder('<')
+        buffers.append(np.ascontiguousarray(column.value, dtype=dtype))
+        entries.append({
+            'name': name,
+            'units': column.units,
+            'dtype': dtype.str,
+            'shape': list(column.shape),
+        })
+
+    offset = 0
+    for entry, buf in zip(entries, buffers):
+        entry['offset'] = offset
+        offset = _align(offset + buf.nbytes)
+    header = json.dumps({'kind': kind, 'columns': entries},
+                        separators=(',', ':')).encode('utf-8')
+    data_start = _align(_PREAMBLE + len(header))
+
+    with open(filename, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<BBI', VERSION[0], VERSION[1], len(header)))
+        f.write(header)
+        for entry, buf in zip(entries, buffers):
+            f.write(b'\0' * (data_start + entry['offset'] - f.tell()))
+            buf.tofile(f)
+
+
+def load(filename, mmap_mode='r'):
+    """
+    Read a file written by save. Columns are memory-mapped with the given
+    mode ('r', 'r+' or 'c') so opening is independent of file size; pass
+    mmap_mode=None to read everything into memory instead.
+    """
+    if mmap_mode not in ('r', 'r+', 'c', None):
+        raise ValueError("mmap_mode must be 'r', 'r+', 'c' or None, not %(1)r" % {'1': mmap_mode})
+    with open(filename, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError('%(1)s is not a units file' % {'1': filename})
+        major, minor, header_len = struct.unpack('<BBI', f.read(6))
+        if major != VERSION[0]:
+            raise ValueError('Unsupported units file version %(1)s.%(2)s' % {'1': major, '2': minor})
+        header = json.loads(f.read(header_len).decode('utf-8'))
+        data_start = _align(_PREAMBLE + header_len)
+        columns = OrderedDict()
+        for entry in header['columns']:
+            dtype = np.dtype(entry['dtype'])
+            shape = tuple(entry['shape'])
+            count = int(np.prod(shape))
+            if count == 0:
+                values = np.empty(shape, dtype=dtype)
+            elif mmap_mode is None:
+                f.seek(data_start + entry['offset'])
+                values = np.fromfile(f, dtype=dtype, count=count).reshape(shape)
+            else:
+                values = np.memmap(filename, dtype=dtype, mode=mmap_mode,
+                                   offset=data_start + entry['offset'], shape=shape)
+            columns[entry['name']] = array(values, entry['units'])
+    if header['kind'] == 'array':
+        return columns[None]
+    return columns
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
@@ -0,0 +1,109 @@
+""" stream.py provides an asyncio pipeline that converts live records to SI
+(or IM) units in micro-batches """
+from __future__ import print_function, division, absolute_import
+import asyncio
+
+import numpy as np
+
+from .units import Value, _parse_units
+from .quantity import array
+from .table import QuantityTable
+
+__all__ = ['convert_stream']
+
+_DONE = object()
+
+
+async def convert_stream(records, schema, system='SI', max_batch=1024, max_delay=0.05,
+                         max_pending=None, executor=None, offload_size=None):
+    """
+    Consume an async iterator of records (mappings of field name to number)
+    and yield QuantityTable batches converted to the given unit system.
+
+    schema maps each field to the units its numbers are in; conversion
+    factors and offsets are resolved once up front. A batch is emitted when
+    it holds max_batch records or max_delay seconds after its first record
+    arrived, whichever comes first. At most max_pending records (default
+    2*max_batch) are buffered ahead of the consumer, so a slow consumer
+    applies backpressure to the source. Batches of at least offload_size
+    records are converted on executor instead of the event loop.
+    """
+    compiled = _compile(schema, system)
+    if max_pending is None:
+        max_pending = 2 * max_batch
+    queue = asyncio.Queue(maxsize=max_pending)
+    loop = asyncio.get_running_loop()
+    producer = loop.create_task(_produce(records, queue))
+    try:
+        done = False
+        error = None
+        while not done:
+            batch = []
+            item = await queue.get()
+            deadline = loop.time() + max_delay
+            while True:
+                if item is _DONE or isinstance(item, BaseException):
+                    done = True
+                    if item is not _DONE:
+                        error = item
+                    break
+                batch.append(item)
+                if len(batch) >= max_batch:
+                    break
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            if not batch:
+                break
+            if executor is not None and offload_size is not None and len(batch) >= offload_size:
+                table = await loop.run_in_executor(executor, _convert_batch, batch, compiled)
+            else:
+                table = _convert_batch(batch, compiled)
+            yield table
+        if error is not None:
+            raise error
+    finally:
+        producer.cancel()
+
+
+async def _produce(records, queue):
+    try:
+        async for record in records:
+            await queue.put(record)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        await queue.put(e)
+        return
+    await queue.put(_DONE)
+
+
+def _compile(schema, system):
+    compiled = []
+    for name, units in schema.items():
+        if type(units) != list:
+            units = _parse_units(units)
+        unit = Value(1, units)
+        if system == 'SI':
+            compiled.append((name, unit.SIFactor, unit.SIOffset, unit.SIUnits))
+        elif system == 'IM':
+            compiled.append((name, unit.IMFactor, unit.IMOffset, unit.IMUnits))
+        else:
+            raise ValueError('Unknown unit system %(1)s' % {'1': system})
+    return compiled
+
+
+def _convert_batch(batch, compiled):
+    columns = []
+    for name, factor, offset, units in compiled:
+        values = np.fromiter((record[name] for record in batch), dtype=float, count=len(batch))
+        if factor != 1:
+            values *= factor
+        if offset != 0:
+            values += offset
+        columns.append((name, array(values, units)))
+    return QuantityTable(columns)
@@ -0,0 +1,108 @@
+""" table.py provides QuantityTable, a columnar container holding one
+unit-tagged array per field """
+from __future__ import print_function, division, absolute_import
+from collections import OrderedDict
+
+import numpy as np
+
+from .quantity import array
+from . import storage
+
+__all__ = ['QuantityTable']
+
+
+class QuantityTable(object):
+    def __init__(self, columns=None):
+        """
+        Columns are given as a mapping (or sequence of pairs) of name to
+        array, all of the same length:
+            QuantityTable([('t', array(t, 's')), ('F', array(F, 'lbf'))])
+        """
+        self.__columns = OrderedDict()
+        if columns is None:
+            columns = []
+        elif hasattr(columns, 'items'):
+            columns = columns.items()
+        for name, column in columns:
+            self[name] = column
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Build a table from a sequence of dicts of Value, converting each
+        field in a single pass.
+        """
+        records = list(records)
+        names = list(records[0].keys()) if records else []
+        return cls([(name, array.fromvalues([r[name] for r in records])) for name in names])
+
+    @classmethod
+    def load(cls, filename, mmap_mode='r'):
+        return cls(storage.load(filename, mmap_mode=mmap_mode))
+
+    def save(self, filename):
+        storage.save(filename, self.__columns)
+
+    @property
+    def columns(self):
+        return list(self.__columns.keys())
+
+    @property
+    def units(self):
+        return OrderedDict((name, c.units) for name, c in self.__columns.items())
+
+    def __len__(self):
+        for column in self.__columns.values():
+            return len(column)
+        return 0
+
+    def __contains__(self, name):
+        return name in self.__columns
+
+    def __iter__(self):
+        return iter(self.__columns)
+
+    def items(self):
+        return self.__columns.items()
+
+    def __getitem__(self, key):
+        """
+        A column name returns that column; an integer returns the row as a
+        dict of Value; a slice, index array or boolean mask returns a new
+        table selecting those rows from every column.
+        """
+        if isinstance(key, str):
+            return self.__columns[key]
+        if isinstance(key, (int, np.integer)):
+            return OrderedDict((name, c[key]) for name, c in self.__columns.items())
+        if type(key) == array:
+            raise TypeError('Cannot index a QuantityTable with a unit-tagged array')
+        return QuantityTable([(name, c[key]) for name, c in self.__columns.items()])
+
+    def __setitem__(self, name, column):
+        if type(column) != array:
+            raise TypeError('Columns must be of type %(1)s, not %(2)s' % {'1': array, '2': type(column)})
+        others = [c for n, c in self.__columns.items() if n != name]
+        if others and len(others[0]) != len(column):
+            raise ValueError('Column %(1)s has length %(2)s, expected %(3)s' % {'1': name, '2': len(column), '3': len(others[0])})
+        self.__columns[name] = column
+
+    def __delitem__(self, name):
+        del self.__columns[name]
+
+    def convert(self, system='SI', inplace=False):
+        """
+        Express every column in SI (or IM) units. See array.convert.
+        """
+        converted = [(name, c.convert(system, inplace=inplace)) for name, c in self.__columns.items()]
+        if inplace:
+            return self
+        return QuantityTable(converted)
+
+    @property
+    def SI(self):
+        return self.convert('SI')
+
+    @property
+    def IM(self):
+        return self.convert('IM')
@@ -0,0 +1,42 @@
+from __future__ import division, absolute_import, print_function
+import os
+import subprocess
+import sys
+import pytest
+
+# Cumulative `import units` time budget, in microseconds, as reported by
+# python -X importtime. The scalar core should stay well below NumPy's own
+# import time.
+IMPORT_BUDGET = 50000
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def run(code, *flags):
+    return subprocess.run([sys.executable] + list(flags) + ['-c', code], cwd=ROOT,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          universal_newlines=True, check=True)
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason='lazy imports require Python 3.7')
+def test_scalar_core_does_not_import_numpy():
+    out = run("import sys, units\n"
+              "print(units.Value(1, 'ft').SIValue)\n"
+              "print('numpy' in sys.modules)\n"
+              "units.array\n"
+              "print('numpy' in sys.modules)").stdout.split()
+    assert out == ['0.3048', 'False', 'True']
+    out = run("import sys\n"
+              "from units import *\n"
+              "print(Value(1, 'ft').SIValue)\n"
+              "print('numpy' in sys.modules, 'asyncio' in sys.modules)").stdout.split()
+    assert out == ['0.3048', 'False', 'False']
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason='-X importtime requires Python 3.7')
+def test_import_time_budget():
+    report = run('import units', '-X', 'importtime').stderr
+    lines = [line for line in report.splitlines() if line.rstrip().endswith('| units')]
+    assert lines, report
+    cumulative = int(lines[-1].split('|')[1])
+    assert cumulative < IMPORT_BUDGET, report
@@ -0,0 +1,88 @@
+from __future__ import division, absolute_import, print_function
+from units import *
+import numpy as np
+import pytest
+
+pd = pytest.importorskip('pandas')
+from units.pandas_ext import UnitsDtype, UnitsArray
+
+
+def test_dtype():
+    assert UnitsDtype('m/s') == 'units[m/s]'
+    assert UnitsDtype(['m', 's^-1']) == UnitsDtype('m/s')
+    assert UnitsDtype('kg*m/s^2').units == ['kg', 'm', 's^-2.0']
+    assert pd.api.types.pandas_dtype('units[ft/s]') == UnitsDtype('ft/s')
+
+
+def test_construction_and_conversion():
+    s = pd.Series([1.0, 2.0, np.nan], dtype='units[ft/s]')
+    assert s.isna().tolist() == [False, False, True]
+    assert s[0].units == ['ft', 's^-1.0']
+    m = s.units.to('m/s')
+    assert m.dtype == UnitsDtype('m/s')
+    assert np.allclose(np.asarray(m)[:2], [0.3048, 0.6096])
+    mixed = pd.Series([Value(1, ['m', 's^-1']), Value(1, ['ft', 's^-1'])], dtype='units[m/s]')
+    assert np.allclose(np.asarray(mixed), [1, 0.3048])
+    assert s.units.IM.dtype == UnitsDtype('ft/s')
+
+
+def test_arithmetic():
+    df = pd.DataFrame({
+        'x': pd.Series([1.0, 2.0, 3.0], dtype='units[m]'),
+        't': pd.Series([1.0, 2.0, 3.0], dtype='units[s]'),
+    })
+    v = df['x']/df['t']
+    assert v.dtype == UnitsDtype('m/s')
+    assert np.asarray(v).tolist() == [1, 1, 1]
+    assert (df['x']*2).dtype == UnitsDtype('m')
+    assert (df['x'] > Value(1.5, 'm')).tolist() == [False, True, True]
+    with pytest.raises(DimsDoNotAgreeError):
+        df['x'] + df['t']
+
+
+def test_reshaping():
+    a = pd.Series([3.0, 1.0, 2.0, 4.0], dtype='units[ft]')
+    b = pd.Series([1.0], dtype='units[m]')
+    both = pd.concat([a, b], ignore_index=True)
+    assert both.dtype == UnitsDtype('m')
+    assert np.allclose(np.asarray(both), [0.9144, 0.3048, 0.6096, 1.2192, 1])
+    assert np.asarray(a.sort_values()).tolist() == [1, 2, 3, 4]
+    groups = pd.DataFrame({'k': [0, 0, 1, 1], 'v': a}).groupby('k')['v'].sum()
+    assert groups.dtype == UnitsDtype('ft')
+    assert np.asarray(groups).tolist() == [4, 6]
+    assert a.sum().units == ['ft']
+    assert np.asarray(a.quantile([0.5])).tolist() == [2.5]
+    assert a.quantile([0.5]).dtype == UnitsDtype('ft')
+
+
+def test_duplicates_and_describe():
+    s = pd.Series([1.0, 2.0, 2.0, 5.0], dtype='units[ft]')
+    assert s.duplicated().tolist() == [False, False, True, False]
+    assert s.drop_duplicates().dtype == UnitsDtype('ft')
+    assert np.asarray(s.drop_duplicates()).tolist() == [1, 2, 5]
+    summary = s.units.describe()
+    assert summary['count'] == 4
+    assert summary['mean'].value == 2.5
+    assert summary['mean'].units == ['ft']
+    assert summary['50%'].value == 2
+    assert summary['max'].value == 5
+
+
+def test_isin_and_reductions():
+    s = pd.Series([1.0, 2.0], dtype='units[ft]')
+    assert s.isin([Value(1, 'ft'), Value(24, 'in')]).tolist() == [True, True]
+    assert s.isin([Value(2, 'in')]).tolist() == [False, False]
+    with pytest.raises(DimsDoNotAgreeError):
+        s.isin([Value(1, 's')])
+    m = pd.Series([1.0, 2.0], dtype='units[m]')
+    assert np.asarray(Value(3, 'm') - m).tolist() == [2, 1]
+    assert (Value(2, 's') * m).dtype == UnitsDtype('m*s')
+    assert (Value(1.5, 'm') < m).tolist() == [False, True]
+    T = pd.Series([20.0, 30.0], dtype='units[degC]')
+    with pytest.raises(DimsDoNotAgreeError):
+        T.sum()
+    assert T.std().units == ['delta_degC']
+    assert T.mean().value == 25
+    empty = pd.Series([np.nan], dtype='units[m]')
+    assert np.isnan(empty.sum(min_count=1).value)
+    assert empty.sum().value == 0
@@ -0,0 +1,29 @@
+from __future__ import division, absolute_import, print_function
+from units import *
+from units import parse
+import numpy as np
+import pytest
+
+
+def test_parse_mixed_units():
+    a = parse(['12.5 ft/s', '3 mi/h', ' 0.8 m/s', '2 m s^-1'], 'm/s')
+    assert a.units == ['m', 's^-1.0']
+    assert np.allclose(a.value, [12.5*0.3048, 3*1609.344/3600, 0.8, 2])
+    b = parse(['1 km', '1 mi'], ['ft'])
+    assert np.allclose(b.value, [1000/0.3048, 5280])
+    assert parse([], 'm').size == 0
+
+
+def test_parse_reports_every_bad_row():
+    rows = ['1 m/s', 'x m/s', '2 kg', '3 furlong/s', '4 kg', '5 ft/s']
+    with pytest.raises(ParseError) as info:
+        parse(rows, 'm/s')
+    assert sorted(info.value.errors) == [1, 2, 3, 4]
+    coerced = parse(rows, 'm/s', errors='coerce')
+    assert list(np.isnan(coerced.value)) == [False, True, True, True, True, False]
+    assert coerced.value[5] == 5*0.3048
+
+
+def test_parse_temperatures():
+    a = parse(['0 degC', '32 degF', '273.15 K', '491.67 degR'], 'degC')
+    assert np.allclose(a.value, 0)
@@ -0,0 +1,25 @@
+from __future__ import division, absolute_import, print_function
+import json
+
+from units import profile
+
+
+def test_run():
+    results = profile.run(20)
+    assert list(results)[0] == 'Value()'
+    construct = results['Value()']
+    assert construct['bytes'] > 0
+    assert construct['blocks'] > 0
+    assert 'conversions' in construct['by_method']
+    assert results['a < b']['bytes'] < construct['bytes']
+
+
+def test_main(capsys):
+    profile.main(['-n', '5'])
+    out = capsys.readouterr().out
+    assert out.startswith('units allocation profile (n=5)')
+    assert 'retained bytes/op by Value method' in out
+    profile.main(['-n', '5', '--json'])
+    data = json.loads(capsys.readouterr().out)
+    assert data['n'] == 5
+    assert 'a + b' in data['operations']
@@ -0,0 +1,55 @@
+from __future__ import division, absolute_import, print_function
+from units import *
+from units import array, save, load
+import numpy as np
+import pytest
+
+
+def test_roundtrip_array(tmpdir):
+    path = str(tmpdir.join('a.units'))
+    a = array(np.linspace(0, 1, 11), ['ft', 's^-1'])
+    save(path, a)
+    b = load(path)
+    assert isinstance(b.value, np.memmap)
+    assert b.units == a.units
+    assert list(b.value) == list(a.value)
+    c = load(path, mmap_mode=None)
+    assert not isinstance(c.value, np.memmap)
+    assert list(c.SIValue) == list(a.SIValue)
+
+
+def test_roundtrip_table(tmpdir):
+    path = str(tmpdir.join('t.units'))
+    columns = {
+        't': array(np.arange(5), ['s']),
+        'F': array(np.arange(10, dtype='>f4').reshape(5, 2), ['lbf']),
+        'empty': array([], ['m']),
+    }
+    save(path, columns)
+    with open(path, 'rb') as f:
+        assert f.read(6) == b'\x93UNITS'
+    loaded = load(path)
+    assert set(loaded) == set(columns)
+    assert loaded['F'].shape == (5, 2)
+    assert loaded['F'].dtype == np.dtype('<f4')
+    assert loaded['F'].units == ['lbf']
+    assert loaded['F'].value[4, 1] == 9
+    assert loaded['empty'].size == 0
+    for column in loaded.values():
+        assert column.value.ctypes.data % 64 == 0 or column.size == 0
+
+
+def test_bad_file(tmpdir):
+    path = str(tmpdir.join('bad.units'))
+    with open(path, 'wb') as f:
+        f.write(b'not a units file')
+    with pytest.raises(ValueError):
+        load(path)
+
+
+def test_bad_mmap_mode(tmpdir):
+    path = str(tmpdir.join('a.units'))
+    save(path, array([1.0, 2.0], ['m']))
+    with pytest.raises(ValueError):
+        load(path, mmap_mode='w+')
+    assert list(load(path).value) == [1.0, 2.0]
@@ -0,0 +1,55 @@
+from __future__ import division, absolute_import, print_function
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from units import *
+from units import convert_stream
+import numpy as np
+import pytest
+
+pytestmark = pytest.mark.skipif(sys.version_info < (3, 7), reason='requires asyncio async generators')
+
+if sys.version_info >= (3, 7):
+    import asyncio
+
+    async def telemetry(n, delay_every=None):
+        for i in range(n):
+            if delay_every and i and i % delay_every == 0:
+                await asyncio.sleep(0.05)
+            yield {'t': i, 'F': 1.0, 'v': 10.0}
+
+    async def collect(stream):
+        return [batch async for batch in stream]
+
+
+SCHEMA = {'t': 'min', 'F': 'lbf', 'v': 'ft/s'}
+
+
+def test_count_window():
+    batches = asyncio.run(collect(convert_stream(telemetry(10), SCHEMA, max_batch=4, max_delay=1)))
+    assert [len(b) for b in batches] == [4, 4, 2]
+    first = batches[0]
+    assert first['t'].units == ['s']
+    assert list(first['t'].value) == [0, 60, 120, 180]
+    assert first['F'].units == ['N']
+    assert np.allclose(first['v'].value, 3.048)
+
+
+def test_time_window():
+    stream = convert_stream(telemetry(6, delay_every=3), SCHEMA, max_batch=100, max_delay=0.01)
+    batches = asyncio.run(collect(stream))
+    assert [len(b) for b in batches] == [3, 3]
+
+
+def test_offload_and_errors():
+    with ThreadPoolExecutor(1) as executor:
+        stream = convert_stream(telemetry(8), SCHEMA, system='IM', max_batch=8,
+                                executor=executor, offload_size=4)
+        batches = asyncio.run(collect(stream))
+    assert batches[0]['F'].units == ['lbf']
+
+    async def broken():
+        yield {'t': 0, 'F': 0, 'v': 0}
+        raise RuntimeError('link lost')
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(collect(convert_stream(broken(), SCHEMA)))
@@ -0,0 +1,71 @@
+from __future__ import division, absolute_import, print_function
+from units import *
+from units import array, QuantityTable
+import numpy as np
+import pytest
+
+
+def make_table():
+    return QuantityTable([
+        ('t', array([0, 1, 2, 3], ['s'])),
+        ('F', array([0, 100, 200, 50], ['lbf'])),
+        ('mdot', array([1, 2, 2, 1], ['kg', 's^-1'])),
+    ])
+
+
+def test_columns():
+    table = make_table()
+    assert table.columns == ['t', 'F', 'mdot']
+    assert len(table) == 4
+    assert table.units['mdot'] == ['kg', 's^-1.0']
+    table['Isp'] = table['F']/table['mdot']
+    assert table['Isp'].SIUnits == ['kg^-1', 's', 'N']
+    with pytest.raises(ValueError):
+        table['bad'] = array([1, 2], ['s'])
+    with pytest.raises(TypeError):
+        table['bad'] = [1, 2, 3, 4]
+
+
+def test_rows_and_filtering():
+    table = make_table()
+    row = table[1]
+    assert row['F'].value == 100
+    assert row['F'].units == ['lbf']
+    burning = table[table['F'] > Value(60, 'lbf')]
+    assert len(burning) == 2
+    assert list(burning['t'].value) == [1, 2]
+    head = table[:2]
+    assert list(head['mdot'].value) == [1, 2]
+    assert np.shares_memory(head['t'].value, table['t'].value)
+
+
+def test_convert():
+    table = make_table()
+    si = table.SI
+    assert si['F'].units == ['N']
+    assert abs(si['F'].value[1] - 444.82) < 1e-9
+    assert table['F'].units == ['lbf']
+    table.convert('SI', inplace=True)
+    assert table['F'].units == ['N']
+
+
+def test_from_records():
+    records = [
+        {'t': Value(0, 's'), 'v': Value(1, ['m', 's^-1'])},
+        {'t': Value(1, 'min'), 'v': Value(1, ['ft', 's^-1'])},
+    ]
+    table = QuantityTable.from_records(records)
+    assert list(table['t'].SIValue) == [0, 60]
+    assert list(table['v'].SIValue) == [1, 0.3048]
+    with pytest.raises(DimsDoNotAgreeError):
+        QuantityTable.from_records(records + [{'t': Value(1, 'm'), 'v': Value(1, 'm')}])
+
+
+def test_save_load(tmpdir):
+    path = str(tmpdir.join('table.units'))
+    table = make_table()
+    table.save(path)
+    loaded = QuantityTable.load(path)
+    assert loaded.columns == table.columns
+    assert loaded.units == table.units
+    assert list(loaded['F'].value) == list(table['F'].value)
@@ -1,5 +1,7 @@
 from __future__ import division, absolute_import, print_function
 from units import *
+from units import array, sort, argsort, searchsorted, isclose
+import numpy as np
 import pytest
 
 # add openrocketengine to env. variables so we can import openrocketengine here
@@ -176,3 +178,284 @@ class TestExpectedErrors(object):
             a>=b
         with pytest.raises(DimsDoNotAgreeError):
             a>b
+
+class TestTemperature(object):
+    def test_absolute(self):
+        error = 1e-9
+        assert abs(Value(20, 'degC').SIValue - 293.15) < error
+        assert Value(20, 'degC').SIUnits == ['K']
+        assert abs(Value(32, 'degF').SIValue - 273.15) < error
+        assert abs(Value(491.67, 'degR').SIValue - 273.15) < error
+        assert abs(Value(0, 'degC').IMValue - 491.67) < error
+        assert Value(0, 'degC').IMUnits == ['degR']
+        assert abs(Value(300, 'K').IMValue - 540) < error
+
+    def test_delta(self):
+        error = 1e-9
+        # Temperatures inside compound units are intervals
+        assert Value(1, ['kg', 'degC^-1']).SIValue == 1
+        assert abs(Value(1, ['kg', 'degF^-1']).SIValue - 1.8) < error
+        assert abs((Value(20, 'degC') - Value(10, 'degC')).SIValue - 10) < error
+        assert abs((Value(20, 'degC') + Value(9, 'delta_degF')).SIValue - 298.15) < error
+        with pytest.raises(DimsDoNotAgreeError):
+            Value(20, 'degC') + Value(10, 'degC')
+
+    def test_array(self):
+        a = array([-40, 0, 100], ['degC'])
+        assert np.allclose(a.SIValue, [233.15, 273.15, 373.15])
+        assert np.allclose(a.to('degF').value, [-40, 32, 212])
+        assert a.diff().units == ['delta_degC']
+        assert np.allclose((a - a[1]).SIValue, [-40, 0, 100])
+        with pytest.raises(DimsDoNotAgreeError):
+            a + a
+        with pytest.raises(DimsDoNotAgreeError):
+            a.sum()
+        with pytest.raises(DimsDoNotAgreeError):
+            a.cumsum()
+        assert abs(a.mean().SIValue - Value(20, 'degC').SIValue) < 1e-9
+        # Scaling and negation act in kelvin, matching Value
+        T = array([20.], ['degC'])
+        assert np.allclose((T*2).SIValue, (Value(20, 'degC')*2).SIValue)
+        assert (T*2).units == ['K']
+        assert np.allclose((T/2).SIValue, 146.575)
+        assert np.allclose((-T).SIValue, -293.15)
+        assert np.allclose(abs(T).SIValue, 293.15)
+        T *= 2
+        assert T.units == ['K']
+        assert np.allclose(T.value, 586.3)
+        a.convert('IM', inplace=True)
+        assert a.units == ['degR']
+        assert np.allclose(a.value, [419.67, 491.67, 671.67])
+
+class TestArray(object):
+    def test_reductions(self):
+        a = array([1, 2, 3, 4], ['ft'])
+        assert abs(a.sum().SIValue - 10*0.3048) < 1e-12
+        assert a.sum().SIUnits == ['m']
+        assert abs(a.mean().SIValue - 2.5*0.3048) < 1e-12
+        assert a.min().value == 1
+        assert a.max().value == 4
+        assert abs(a.std().value - np.std([1, 2, 3, 4])) < 1e-12
+        assert list(a.cumsum().value) == [1, 3, 6, 10]
+        assert a.cumsum().units == ['ft']
+        assert list(a.diff().value) == [1, 1, 1]
+
+    def test_axis(self):
+        a = array(np.arange(6).reshape(2, 3), ['N'])
+        assert list(a.sum(axis=0).value) == [3, 5, 7]
+        assert list(a.max(axis=1).value) == [2, 5]
+        assert a.sum(axis=0).units == ['N']
+        assert a.diff(axis=0).shape == (1, 3)
+
+    def test_integrals_and_rates(self):
+        F = array([0, 10, 10, 0], ['N'])
+        t = array([0, 1, 2, 3], ['s'])
+        impulse = F.trapz(t)
+        assert impulse.SIValue == 20
+        assert impulse.SIUnits == ['s', 'N']
+        assert F.trapz(dx=Value(1, 'min')).SIValue == 20*60
+        x = array([0, 1, 4, 9], ['m'])
+        rate = x.diff()/t.diff()
+        assert list(rate.SIValue) == [1, 3, 5]
+        assert rate.SIUnits == ['m', 's^-1']
+        v = x.gradient(t)
+        assert list(v.SIValue) == list(np.gradient([0, 1, 4, 9], [0, 1, 2, 3]))
+        assert v.SIUnits == ['m', 's^-1']
+
+    def test_arithmetic(self):
+        a = array([1, 2], ['ft'])
+        b = array([1, 2], ['m'])
+        assert (a+a).units == ['ft']
+        assert list((a+b).SIValue) == [1.3048, 2.6096]
+        assert (a*b).SIUnits == ['m^2']
+        assert (b/Value(2, 's')).SIUnits == ['m', 's^-1']
+        assert list(b < a) == [False, False]
+        with pytest.raises(DimsDoNotAgreeError):
+            a + Value(1, 's')
+        with pytest.raises(TypeError):
+            a + 1
+
+    def test_value_on_the_left(self):
+        b = array([1, 2], ['m'])
+        assert list((Value(1, 'm') + b).SIValue) == [2, 3]
+        assert list((Value(1, 'm') - b).SIValue) == [0, -1]
+        assert list((Value(2, 's') * b).SIValue) == [2, 4]
+        assert (Value(2, 's') * b).SIUnits == ['m', 's']
+        assert list((Value(2, 's') / b).SIValue) == [2, 1]
+        assert (Value(2, 's') / b).SIUnits == ['m^-1', 's']
+        assert list(Value(1.5, 'm') < b) == [False, True]
+        assert list(Value(1, 'm') == b) == [True, False]
+        with pytest.raises(DimsDoNotAgreeError):
+            Value(1, 's') + b
+
+    def test_zero_copy(self, tmpdir):
+        raw = np.arange(8, dtype=float)
+        a = array(raw, ['ft'])
+        assert np.shares_memory(a.value, raw)
+        assert np.shares_memory(a[2:5].value, raw)
+        b = array(memoryview(raw.tobytes()), ['ft'])
+        assert list(b.value) == list(raw)
+        c = array.frombuffer(raw.astype('<f4').tobytes(), ['s'], dtype='<f4', offset=4, count=2)
+        assert list(c.value) == [1, 2]
+
+        path = str(tmpdir.join('raw.bin'))
+        raw.tofile(path)
+        m = array.memmap(path, ['ft'], mode='r+')
+        assert abs(m[1:3].SIValue[1] - 2*0.3048) < 1e-12
+        m.convert('SI', inplace=True)
+        assert m.units == ['m']
+        assert abs(np.fromfile(path)[2] - 2*0.3048) < 1e-12
+
+    def test_inplace(self):
+        state = array(np.zeros(3), ['m'])
+        buffer = state.value
+        state += array([1, 2, 3], ['m'])
+        state += Value(1, 'ft')
+        state -= array([1, 1, 1], ['m'])
+        assert state.value is buffer
+        assert state.units == ['m']
+        assert np.allclose(state.value, [0.3048, 1.3048, 2.3048])
+        state *= 2
+        state /= Value(2, 's')
+        assert state.value is buffer
+        assert state.units == ['m', 's^-1.0']
+        with pytest.raises(DimsDoNotAgreeError):
+            state += Value(1, 'm')
+        T = array([20, 30], ['degC'])
+        T += Value(9, 'delta_degF')
+        assert np.allclose(T.value, [25, 35])
+        with pytest.raises(DimsDoNotAgreeError):
+            T += T
+
+    def test_inplace_mixed_units(self):
+        s = array([1.], ['m'])
+        s *= Value(1, 'ft')
+        assert s.SIUnits == ['m^2']
+        assert np.allclose(s.SIValue, 0.3048)
+        assert np.allclose((s + Value(1, 'm^2')).SIValue, 1.3048)
+        d = array([2.], ['ft'])
+        d /= Value(1, 'm')
+        assert d.SIUnits == []
+        assert np.allclose(d.value, 0.6096)
+        rate = array([1., 2.], ['ft', 's^-1'])
+        assert rate.multiply(Value(2, 's')).units == ['ft']
+
+    def test_out(self):
+        rate = array([1, 2], ['ft', 's^-1'])
+        step = array(np.empty(2), ['ft'])
+        assert rate.multiply(Value(2, 's'), out=step) is step
+        assert list(step.value) == [2, 4]
+        assert rate.divide(2).units == rate.units
+        assert list(rate.add(rate).value) == [2, 4]
+        with pytest.raises(TypeError):
+            rate.add(rate, out=np.empty(2))
+        x = array([1., 2.], ['m'])
+        seconds = array(np.zeros(2), ['s'])
+        with pytest.raises(DimsDoNotAgreeError):
+            x.add(x, out=seconds)
+        assert seconds.units == ['s']
+        assert list(seconds.value) == [0, 0]
+        inches = array(np.empty(2), ['in'])
+        assert x.multiply(2, out=inches) is inches
+        assert inches.units == ['in']
+        assert np.allclose(inches.SIValue, [2, 4])
+
+    def test_inplace_steady_state_allocation(self):
+        tracemalloc = pytest.importorskip('tracemalloc')
+        n = 100000
+        state = array(np.zeros(n), ['m'])
+        rate = array(np.ones(n), ['m', 's^-1'])
+        dt = Value(0.01, 's')
+        step = array(np.empty(n), ['m'])
+
+        rate.multiply(dt, out=step)
+        state += step
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            for i in range(10):
+                rate.multiply(dt, out=step)
+                state += step
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        # Far less than one temporary buffer of 8*n bytes
+        assert peak - before < n
+        assert np.allclose(state.value, 0.11)
+
+    def test_dtype(self):
+        a = array(np.arange(4, dtype=np.float32), ['ft'])
+        assert a.SIValue.dtype == np.float32
+        assert a.to('in').dtype == np.float32
+        assert (a*Value(2, 's')).dtype == np.float32
+        assert a.convert('SI', dtype=np.float64).dtype == np.float64
+        assert a.sum(dtype=np.float64).value == 6
+        b = array([1, 2, 3], ['min'], dtype=np.int64)
+        assert b.to('s').dtype == np.int64
+        assert list(b.to('s').value) == [60, 120, 180]
+        assert b.SIValue.dtype == np.float64
+        # Arithmetic on integer storage is not rounded
+        c = array(np.arange(4), ['ft'])
+        assert np.allclose((c + array(np.ones(4), ['m'])).SIValue, np.arange(4)*0.3048 + 1)
+        assert list(c < array([0.5, 0.5, 0.5, 0.5], ['m'])) == [True, True, False, False]
+        assert abs(c.trapz().SIValue - 4.5*0.3048) < 1e-12
+        with pytest.raises(TypeError):
+            array(['a'], ['m'], dtype=object)
+
+    def test_dtype_warnings(self):
+        with pytest.warns(ConversionWarning):
+            rounded = array([1, 2, 3], ['ft'], dtype=np.int32).convert('SI')
+        assert rounded.dtype == np.int32
+        assert list(rounded.value) == [0, 1, 1]
+        with pytest.warns(ConversionWarning):
+            array([3e38], ['ft'], dtype=np.float32).to('in')
+        with pytest.warns(ConversionWarning):
+            array([2**31 - 1], ['min'], dtype=np.int32).to('s')
+        with pytest.warns(ConversionWarning):
+            array([1.5], ['m']).astype(np.int32)
+        # In-place operators keep integer storage, rounding with a warning
+        counts = array(np.array([2, 3]), ['m'])
+        counts *= 2
+        assert counts.dtype.kind == 'i'
+        assert list(counts.value) == [4, 6]
+        with pytest.warns(ConversionWarning):
+            counts /= 4
+        assert list(counts.value) == [1, 2]
+        with pytest.warns(ConversionWarning):
+            counts *= 0.5
+        assert counts.dtype.kind == 'i'
+        assert list(counts.value) == [0, 1]
+
+    def test_large_integers(self):
+        big = array(np.array([2**53 + 1]), ['m'])
+        assert big.to('m').value[0] == 2**53 + 1
+        assert big.astype(np.int64).value[0] == 2**53 + 1
+        buffer = big.value
+        big += array(np.array([2]), ['m'])
+        big *= 2
+        assert big.value is buffer
+        assert big.value[0] == 2*(2**53 + 3)
+        with pytest.warns(ConversionWarning):
+            array(np.array([2**53 + 1]), ['min']).to('s')
+
+    def test_sort_and_search(self):
+        readings = [Value(3, 'ft'), Value(1, 'm'), Value(12, 'in'), Value(0.5, 'm')]
+        ordered = sort(readings)
+        assert ordered.units == ['m']
+        assert np.allclose(ordered.value, [0.3048, 0.5, 0.9144, 1])
+        assert list(argsort(readings)) == [2, 3, 0, 1]
+        assert list(argsort(array([3, 1, 2], ['s']))) == [1, 2, 0]
+        assert searchsorted(ordered, Value(2, 'ft')) == 2
+        assert list(searchsorted(array([1, 2, 3], ['m']), [Value(1, 'ft'), Value(5, 'ft')])) == [0, 1]
+        with pytest.raises(DimsDoNotAgreeError):
+            sort([Value(1, 'm'), Value(1, 's')])
+        with pytest.raises(TypeError):
+            sort([Value(1, 'm'), 1])
+
+    def test_isclose(self):
+        a = array([1, 2], ['ft'])
+        assert list(isclose(a, [Value(12, 'in'), Value(0.6, 'm')])) == [True, False]
+        assert list(isclose(a, [Value(12, 'in'), Value(0.6, 'm')], atol=Value(0.01, 'm'))) == [True, True]
+        with pytest.raises(DimsDoNotAgreeError):
+            isclose(a, a, atol=Value(1, 's'))
+
@@ -1,7 +1,7 @@
 """ units.py provides unit conversion and handling functionality for
 scientific python applications """
 from __future__ import print_function, division, absolute_import
-import numpy as np
+import sys
 
 
 class Value(object):
@@ -37,13 +37,19 @@ class Value(object):
         return str(self.SIValue) + ' ' + str(self.SIUnits)
 
     def __add__(self,b):
+        if _is_collection(b):
+            return NotImplemented
         if type(b) != Value:
             raise TypeError('Addition not supported for types %(1)s, %(2)s' % {'1': type(b), '2': type(Value)})
         if b.SIUnits != self.SIUnits:
             raise DimsDoNotAgreeError('Addition not supported for units %(1)s, %(2)s' % {'1': b.SIUnits, '2': self.SIUnits})
+        if self.SIOffset and b.SIOffset:
+            raise DimsDoNotAgreeError('Addition not supported for absolute temperatures %(1)s, %(2)s; use a delta_ unit for one operand' % {'1': b.units, '2': self.units})
         return Value(self.SIValue+b.SIValue, self.SIUnits)
 
     def __sub__(self,b):
+        if _is_collection(b):
+            return NotImplemented
         if type(b) != Value:
             raise TypeError('Subtraction not supported for types %(1)s, %(2)s' % {'1': type(b), '2': type(Value)})
         if b.SIUnits != self.SIUnits:
@@ -51,7 +57,9 @@ class Value(object):
         return Value(self.SIValue-b.SIValue, self.SIUnits)
 
     def __mul__(self,b):
-        if type(b) != Value and type(b) != int and type(b) != np.float32 and type(b) != np.float64:
+        if _is_collection(b):
+            return NotImplemented
+        if type(b) != Value and type(b) != int and not _is_numpy_float(b):
             raise TypeError('Multiplication not supported for types %(1)s, %(2)s' % {'1': type(b), '2': type(Value)})
         if type(b) == Value:
             units = self.SIUnits + b.SIUnits
@@ -63,7 +71,9 @@ class Value(object):
         return self.__mul__(b)
 
     def __truediv__(self,b):
-        if type(b) != Value and type(b) != int and type(b) != np.float32 and type(b) != np.float64:
+        if _is_collection(b):
+            return NotImplemented
+        if type(b) != Value and type(b) != int and not _is_numpy_float(b):
             raise TypeError('Division not supported for types %(1)s, %(2)s' % {'1': type(b), '2': type(Value)})
         if type(b) == Value:
             units = self.SIUnits + self.units_inverter(b.SIUnits)
@@ -72,7 +82,7 @@ class Value(object):
             return Value(self.SIValue/b, self.SIUnits)
 
     def __pow__(self,b):
-        if type(b) != int and type(b) != float and type(b) != np.float32 and type(b) != np.float64:
+        if type(b) != int and type(b) != float and not _is_numpy_float(b):
             raise TypeError('Power operation not supported for types %(1)s, %(2)s' % {'1': type(b), '2': type(Value)})
         return Value(self.SIValue**b, self.units_pow(self.SIUnits, b))
 
@@ -83,6 +93,8 @@ class Value(object):
         return Value(abs(self.SIValue), self.SIUnits)
 
     def __lt__(self,b):
+        if _is_collection(b):
+            return NotImplemented
         if type(b) != Value:
             raise TypeError('< not supported for types %(1)s, %(2)s' % {'1': type(b), '2': type(Value)})
         if b.SIUnits != self.SIUnits:
@@ -90,6 +102,8 @@ class Value(object):
         return (self.SIValue < b.SIValue)
 
     def __le__(self,b):
+        if _is_collection(b):
+            return NotImplemented
         if type(b) != Value:
             raise TypeError('<= not supported for types %(1)s, %(2)s' % {'1': type(b), '2': type(Value)})
         if b.SIUnits != self.SIUnits:
@@ -97,6 +111,8 @@ class Value(object):
         return (self.SIValue <= b.SIValue)
 
     def __eq__(self,b):
+        if _is_collection(b):
+            return NotImplemented
         if type(b) != Value:
             raise TypeError('== not supported for types %(1)s, %(2)s' % {'1': type(b), '2': type(Value)})
         if b.SIUnits != self.SIUnits:
@@ -104,6 +120,8 @@ class Value(object):
         return (self.SIValue == b.SIValue)
 
     def __ne__(self,b):
+        if _is_collection(b):
+            return NotImplemented
         if type(b) != Value:
             raise TypeError('!= not supported for types %(1)s, %(2)s' % {'1': type(b), '2': type(Value)})
         if b.SIUnits != self.SIUnits:
@@ -111,6 +129,8 @@ class Value(object):
         return (self.SIValue != b.SIValue)
 
     def __ge__(self,b):
+        if _is_collection(b):
+            return NotImplemented
         if type(b) != Value:
             raise TypeError('>= not supported for types %(1)s, %(2)s' % {'1': type(b), '2': type(Value)})
         if b.SIUnits != self.SIUnits:
@@ -118,6 +138,8 @@ class Value(object):
         return (self.SIValue >= b.SIValue)
 
     def __gt__(self,b):
+        if _is_collection(b):
+            return NotImplemented
         if type(b) != Value:
             raise TypeError('> not supported for types %(1)s, %(2)s' % {'1': type(b), '2': type(Value)})
         if b.SIUnits != self.SIUnits:
@@ -191,6 +213,14 @@ class Value(object):
                 removed_units.append(unit + '^' + str(exponent))
         return removed_units
 
+    def units_offset(self, offsets):
+        # Offsets only apply to a lone absolute temperature such as ['degC'].
+        # Inside compound units or raised to a power a temperature unit is
+        # an interval and converts by its factor alone.
+        if len(self.units) != 1 or '^' in self.units[0]:
+            return 0
+        return offsets.get(self.units[0], 0)
+
     def units_sorted(self, units):
         simplified_units = self.units_simplify(units)
         sorted_units = sorted(simplified_units, key=self.units_sorted_key)
@@ -207,6 +237,10 @@ class Value(object):
 
     @property
     def SIValue(self):
+        return self.__value * self.SIFactor + self.SIOffset
+
+    @property
+    def SIFactor(self):
         factor = 1
         for element in self.units:
             try:
@@ -220,7 +254,11 @@ class Value(object):
                 unit = element
             conversion = self.conversion_factors[unit]
             factor *= conversion**exponent
-        return self.__value * factor
+        return factor
+
+    @property
+    def SIOffset(self):
+        return self.units_offset(self.conversion_offsets)
 
     @property
     def SIUnits(self):
@@ -245,6 +283,10 @@ class Value(object):
 
     @property
     def IMValue(self):
+        return self.__value * self.IMFactor + self.IMOffset
+
+    @property
+    def IMFactor(self):
         factor = 1
         for element in self.units:
             try:
@@ -258,7 +300,11 @@ class Value(object):
                 unit = element
             conversion = self.conversion_factors_IM[unit]
             factor *= conversion**exponent
-        return self.__value * factor
+        return factor
+
+    @property
+    def IMOffset(self):
+        return self.units_offset(self.conversion_offsets_IM)
 
     @property
     def IMUnits(self):
@@ -300,7 +346,12 @@ class Value(object):
             'lbf': 'N',
             'Pa': 'Pa',
             'psi': 'Pa',
-            'K': 'K'
+            'K': 'K',
+            'degC': 'K',
+            'delta_degC': 'K',
+            'degF': 'K',
+            'delta_degF': 'K',
+            'degR': 'K'
         }
         self.conversion_factors = {
             'kg': 1.0,
@@ -320,7 +371,16 @@ class Value(object):
             'lbf': 4.4482,
             'Pa': 1.0,
             'psi': 6894.7573,
-            'K': 1.0
+            'K': 1.0,
+            'degC': 1.0,
+            'delta_degC': 1.0,
+            'degF': 5/9,
+            'delta_degF': 5/9,
+            'degR': 5/9
+        }
+        self.conversion_offsets = {
+            'degC': 273.15,
+            'degF': 459.67*5/9
         }
         self.conversion_units_IM = {
             'kg': 'lbm',
@@ -339,7 +399,13 @@ class Value(object):
             'N': 'lbf',
             'lbf': 'lbf',
             'Pa': 'psi',
-            'psi': 'psi'
+            'psi': 'psi',
+            'K': 'degR',
+            'degC': 'degR',
+            'delta_degC': 'degR',
+            'degF': 'degR',
+            'delta_degF': 'degR',
+            'degR': 'degR'
         }
         self.conversion_factors_IM = {
             'kg': 2.2046,
@@ -358,7 +424,17 @@ class Value(object):
             'N': 0.2248,
             'lbf': 1.0,
             'Pa': 0.0001450,
-            'psi': 1.0
+            'psi': 1.0,
+            'K': 1.8,
+            'degC': 1.8,
+            'delta_degC': 1.8,
+            'degF': 1.0,
+            'delta_degF': 1.0,
+            'degR': 1.0
+        }
+        self.conversion_offsets_IM = {
+            'degC': 491.67,
+            'degF': 459.67
         }
         self.comparision_dict = {
             'kg': 0,
@@ -379,11 +455,93 @@ class Value(object):
             'Pa': 15,
             'psi': 16,
             'K':17,
+            'degC': 18,
+            'delta_degC': 19,
+            'degF': 20,
+            'delta_degF': 21,
+            'degR': 22,
         }
 
-class array(object):
-    def __init__(self, values, units):
-        pass
+def _affine(source, target):
+    """
+    Scale and offset taking magnitudes in source's units to target's units,
+    where source and target are Values of the same dimensions:
+        target_magnitude = scale*source_magnitude + offset
+    """
+    scale = source.SIFactor / target.SIFactor
+    offset = (source.SIOffset - target.SIOffset) / target.SIFactor
+    return scale, offset
+
+
+def _is_numpy_float(b):
+    """ True for numpy float32/float64 scalars. numpy is never imported
+    here: if it has not been loaded, b cannot be one of its types. """
+    np = sys.modules.get('numpy')
+    return np is not None and (type(b) == np.float32 or type(b) == np.float64)
+
+
+def _is_collection(b):
+    """ True for units.quantity.array and for pandas objects holding a units
+    dtype, whose reflected operators handle a Value operand. As with
+    _is_numpy_float the modules are looked up rather than imported, so the
+    scalar core stays numpy-free. """
+    package = __name__.rpartition('.')[0]
+    quantity = sys.modules.get(package + '.quantity')
+    if quantity is not None and type(b) == quantity.array:
+        return True
+    pandas_ext = sys.modules.get(package + '.pandas_ext')
+    return pandas_ext is not None and isinstance(getattr(b, 'dtype', None), pandas_ext.UnitsDtype)
+
+
+_UNIT_TOKEN = None
+
+
+def _parse_units(string):
+    """
+    Parse a unit string such as 'm/s^2', 'kg*m^2' or 'N s' into the list
+    form used by Value. A '/' inverts only the unit directly after it.
+    """
+    global _UNIT_TOKEN
+    if _UNIT_TOKEN is None:
+        import re
+        _UNIT_TOKEN = re.compile(r'\s*([*/]?)\s*([A-Za-z_]+)(?:\^\(?(-?\d+(?:\.\d*)?(?:/\d+)?)\)?)?\s*')
+    string = string.strip()
+    if string.startswith('1'):
+        string = string[1:]
+    units = []
+    pos = 0
+    while pos < len(string):
+        match = _UNIT_TOKEN.match(string, pos)
+        if match is None or match.end() == pos:
+            raise ValueError('Cannot parse units %(1)s' % {'1': string})
+        op, unit, exponent = match.groups()
+        if exponent is None:
+            exponent = '1'
+        if op == '/':
+            exponent = exponent[1:] if exponent.startswith('-') else '-' + exponent
+        units.append(unit + '^' + exponent)
+        pos = match.end()
+    return units
+
+
+def _format_units(units):
+    """ Inverse of _parse_units, e.g. ['m', 's^-2.0'] -> 'm/s^2'. """
+    numerator = []
+    denominator = []
+    for element in units:
+        things = element.split('^')
+        exponent = float(things[1]) if len(things) > 1 else 1
+        if exponent == int(exponent):
+            exponent = int(exponent)
+        if exponent < 0:
+            denominator.append(things[0] if exponent == -1 else things[0] + '^' + str(-exponent))
+        else:
+            numerator.append(things[0] if exponent == 1 else things[0] + '^' + str(exponent))
+    string = '*'.join(numerator) or '1'
+    for unit in denominator:
+        string += '/' + unit
+    return string
+
 
 class DimsDoNotAgreeError(Exception):
     """Exception raised for errors in the input when addition and subration
@@ -396,6 +554,25 @@ class DimsDoNotAgreeError(Exception):
     def __init__(self, message):
         Exception.__init__(self, message)
 
+
+class ConversionWarning(RuntimeWarning):
+    """Warning issued when converting an array would overflow its dtype or,
+    for integer dtypes, round away part of the result.
+    """
+
+
+class ParseError(ValueError):
+    """Exception raised when some rows of a bulk parse cannot be converted.
+
+    Attributes:
+        message -- explanation of the error
+        errors -- dict of row index to explanation for every failed row
+    """
+
+    def __init__(self, message, errors):
+        ValueError.__init__(self, message)
+        self.errors = errors
+
 # def test():
     # a = Value('100', ['mi','h^-1'])
     # b = Value('10', ['m','s^-1'])
@@ -425,6 +602,14 @@ class DimsDoNotAgreeError(Exception):
     # print('c+b', (c+b).SI) # raises DimsDoNotAgreeError
     # a-10
 
+def __getattr__(name):
+    # array moved to units.quantity so that importing the scalar core does
+    # not import numpy; keep units.units.array working.
+    if name == 'array':
+        from .quantity import array
+        return array
+    raise AttributeError("module %(1)r has no attribute %(2)r" % {'1': __name__, '2': name})
+
 if __name__ == '__main__':
     # test()
     pass